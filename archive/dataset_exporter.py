@@ -1,58 +1,177 @@
 import json
+import operator
 import subprocess
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Iterable, Dict, Any, Optional
+from dataclasses import dataclass, fields, is_dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
+# orjson is an optional, much faster JSON library (written in Rust).
+# If it isn't installed we simply fall back to the standard json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from utils import SyntheticDebugSession
 
+# Output files are written through a 1 MB buffer, so the many small
+# per-entry writes reach the disk as a few large write() calls.
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Calls obj.to_dict() (see utils.py); used with map() so the loop over a
+# session's log entries runs in C instead of in a Python comprehension
+_to_dict = operator.methodcaller("to_dict")
+
+
+def _dc_to_dict(obj) -> Dict[str, Any]:
+    """
+    Shallow dataclass -> dict conversion.
+    Unlike asdict(), this doesn't deep copy every value, it just reads the
+    fields. Our own classes (see utils.py) have a to_dict() that does this
+    without looking the fields up each time. Nested dataclasses are handled
+    by the JSON encoder below.
+    """
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+class _DataclassEncoder(json.JSONEncoder):
+    """
+    JSON encoder that understands our dataclasses.
+    Dataclasses are turned into plain dicts field by field (without the deep
+    copy that asdict() makes) and datetimes into ISO strings like
+    "2024-01-15T10:30:00"; anything else unknown (e.g. Path) becomes a string.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()  # Faster than str(), and matches orjson
+        if is_dataclass(o) and not isinstance(o, type):
+            return _dc_to_dict(o)
+        return str(o)
+
+
 class DatasetExporter:
     """
     Export generated debug sessions to various file formats.
     This allows the data to be used for training or analysis.
     """
 
-    def export_to_json(self, sessions: List[SyntheticDebugSession], output_path: Path):
+    def export_to_json(self, sessions: Iterable[SyntheticDebugSession], output_path: Path):
         """
         Export all sessions to a single JSON file.
         JSON is human-readable and good for small datasets.
+        sessions can be any iterable (e.g. a generator), it is read only once.
         """
-        data = []
+        if not sessions:
+            # Nothing to export (e.g. every bug failed), so skip the encoder
+            # setup. (A generator always counts as non-empty here; it just
+            # goes through the normal path below.)
+            output_path.write_bytes(b"[]\n")
+            return
+
+        # Write the JSON array one session at a time instead of building
+        # the whole list in memory first: "[", entry, ",", entry, ..., "]"
+        if orjson is not None:
+            # Same layout, but each entry is encoded by orjson (see
+            # export_to_jsonl); OPT_INDENT_2 gives the same 2-space indent
+            options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS
+            with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(b"[\n")
+                first = True
+
+                for session in sessions:
+                    if not first:
+                        f.write(b",\n")  # Separator between entries
+                    first = False
+
+                    f.write(orjson.dumps(self._json_entry(session), default=str, option=options))
 
-        for session in sessions:
-            # Convert each session to a dictionary
-            entry = {
-                "bug_id": f"{session.bug_info.project}_{session.bug_info.bug_id}",
-                "project": session.bug_info.project,
-                "bug_info": asdict(session.bug_info),  # Convert dataclass to dict
-                "logs": [asdict(log) for log in session.log_sequence],
-                "timeline": session.investigation_timeline,
-                "root_cause": session.root_cause_summary,
-                "test_failures": [asdict(t) for t in session.test_outputs],
-            }
-            data.append(entry)
+                f.write(b"\n]\n")
+            return
 
-        # Write to file with nice formatting
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2, default=str)  # default=str handles datetime objects
+        with open(output_path, "w", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write("[\n")
+            first = True
 
-    def export_to_jsonl(self, sessions: List[SyntheticDebugSession], output_path: Path):
+            for session in sessions:
+                if not first:
+                    f.write(",\n")  # Separator between entries
+                first = False
+
+                # Write to file with nice formatting
+                # (the encoder converts the dataclasses inside the entry)
+                entry = self._plain_lists(self._json_entry(session))
+                json.dump(entry, f, indent=2, cls=_DataclassEncoder)
+
+            f.write("\n]\n")
+
+    def export_to_jsonl(self, sessions: Iterable[SyntheticDebugSession], output_path: Path):
         """
         Export to JSONL format (one JSON object per line).
         JSONL is better for large datasets and streaming processing.
+        sessions can be any iterable (e.g. a generator), it is read only once.
         """
-        with open(output_path, "w") as f:
+        if not sessions:
+            # Nothing to export: just create an empty file (see export_to_json)
+            output_path.write_bytes(b"")
+            return
+
+        if orjson is not None:
+            # orjson writes bytes and walks dataclasses and datetimes itself
+            # (in native code); default=str only handles the rest, e.g. Path
+            options = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_DATACLASS
+            with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                for session in sessions:
+                    f.write(orjson.dumps(self._jsonl_entry(session), default=str, option=options))
+            return
+
+        with open(output_path, "w", buffering=_WRITE_BUFFER_SIZE) as f:
             for session in sessions:
-                # Create a simplified entry for each session
-                entry = {
-                    "bug_id": f"{session.bug_info.project}_{session.bug_info.bug_id}",
-                    "project": session.bug_info.project,
-                    "logs": [asdict(log) for log in session.log_sequence],
-                    "timeline": session.investigation_timeline,
-                    "root_cause": session.root_cause_summary,
-                }
                 # Write as single line of JSON
-                f.write(json.dumps(entry, default=str) + "\n")
+                entry = self._plain_lists(self._jsonl_entry(session))
+                f.write(json.dumps(entry, cls=_DataclassEncoder) + "\n")
+
+    def _json_entry(self, session: SyntheticDebugSession) -> Dict[str, Any]:
+        """
+        Create the full entry written for each session in JSON files.
+        Nested dataclasses are left as they are; the JSON encoder converts them.
+        """
+        return {
+            "bug_id": session.bug_key,
+            "project": session.bug_info.project,
+            "bug_info": session.bug_info,
+            "logs": session.log_sequence,
+            "timeline": session.investigation_timeline,
+            "root_cause": session.root_cause_summary,
+            "test_failures": session.test_outputs,
+        }
+
+    def _plain_lists(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn the lists of log entries and test outputs in an entry into lists
+        of dicts, for the stdlib json encoder. One map() call per list is
+        cheaper than the encoder calling default() for every single item.
+        (orjson doesn't need this, it reads the dataclasses directly.)
+        """
+        for key in ("logs", "test_failures"):
+            if key in entry:
+                entry[key] = list(map(_to_dict, entry[key]))
+        return entry
+
+    def _jsonl_entry(self, session: SyntheticDebugSession) -> Dict[str, Any]:
+        """
+        Create the simplified entry written for each session in JSONL files.
+        """
+        return {
+            "bug_id": session.bug_key,
+            "project": session.bug_info.project,
+            "logs": session.log_sequence,
+            "timeline": session.investigation_timeline,
+            "root_cause": session.root_cause_summary,
+        }
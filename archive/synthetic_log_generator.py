@@ -1,14 +1,48 @@
-import json
-import subprocess
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
-from pathlib import Path
-import xml.etree.ElementTree as ET
+from functools import lru_cache
 
 from utils import Defects4JBug, LogEntry, SyntheticDebugSession, TestOutput
 
+
+# Keywords used to guess the bug type from a patch, one group per category.
+# Matching all of them in one pass is much cheaper than lower()-ing the
+# (possibly huge) patch and searching it again for every keyword.
+_ROOT_CAUSE_RE = re.compile(r"(null)|(bound|index)|(assert)|(==|!=)", re.IGNORECASE)
+# Label for each group above (group 1 -> first label, ...).
+# Earlier groups win, e.g. a patch mentioning both "index" and "null" is
+# reported as a null pointer issue.
+_ROOT_CAUSE_LABELS = [
+    "Null pointer handling issue",
+    "Array bounds or indexing error",
+    "Assertion or validation error",
+    "Comparison or equality check error",
+]
+
+
+@lru_cache(maxsize=1024)
+def _classify_patch(patch: str) -> str:
+    """
+    Guess the bug type from the keywords in a (non-empty) patch.
+    The answer is remembered, so generating another session for the same
+    bug doesn't scan its patch again.
+    """
+    # Look for keywords in the patch to guess bug type.
+    # Keep the best (lowest numbered) category seen so far; stop as soon
+    # as we see the best possible one.
+    best = None
+    for match in _ROOT_CAUSE_RE.finditer(patch):
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+            if best == 1:
+                break
+
+    if best is None:
+        return "Logic error in implementation"
+    return _ROOT_CAUSE_LABELS[best - 1]
+
+
 class SyntheticLogGenerator:
     """
     Generates realistic debugging logs from Defects4J data.
@@ -37,33 +71,27 @@ class SyntheticLogGenerator:
         log_sequence = []  # All log entries
         investigation_timeline = []  # Human-readable steps
 
-        # Phase 1: Initial setup and test execution
-        phase1_logs, phase1_steps = self._generate_setup_phase(bug, test_outputs)
-        log_sequence.extend(phase1_logs)
-        investigation_timeline.extend(phase1_steps)
-
-        # Phase 2: Test failures and error analysis
-        phase2_logs, phase2_steps = self._generate_failure_phase(bug, test_outputs)
-        log_sequence.extend(phase2_logs)
-        investigation_timeline.extend(phase2_steps)
-
-        # Phase 3: Code investigation
-        phase3_logs, phase3_steps = self._generate_investigation_phase(bug)
-        log_sequence.extend(phase3_logs)
-        investigation_timeline.extend(phase3_steps)
+        # Timestamp strings by offset (in seconds) from base_time. The phases
+        # reuse the same few offsets, so each one is formatted only once.
+        iso_cache: Dict[int, str] = {}
 
-        # Phase 4: Root cause identification
-        phase4_logs, phase4_steps = self._generate_discovery_phase(bug)
-        log_sequence.extend(phase4_logs)
-        investigation_timeline.extend(phase4_steps)
+        # Pick out the failed tests once; both the failure phase and the
+        # summary only look at these.
+        failed_tests = [t for t in test_outputs if t.status == "FAIL"]
 
-        # Phase 5: Fix application and verification
-        phase5_logs, phase5_steps = self._generate_resolution_phase(bug)
-        log_sequence.extend(phase5_logs)
-        investigation_timeline.extend(phase5_steps)
+        # Walk all 5 phases in a single pass. Every phase yields
+        # (log entry, step) pairs straight into the two lists above, instead
+        # of building its own lists that then get copied over.
+        # (the append methods are looked up once, not once per entry)
+        add_log = log_sequence.append
+        add_step = investigation_timeline.append
+        for log, step in self._emit_session(bug, test_outputs, failed_tests, iso_cache):
+            add_log(log)
+            if step is not None:  # Some logs (stack traces) have no step
+                add_step(step)
 
         # Generate a summary of what caused the bug
-        root_cause = self._generate_root_cause_summary(bug, test_outputs)
+        root_cause = self._generate_root_cause_summary(bug, failed_tests)
 
         return SyntheticDebugSession(
             bug_info=bug,
@@ -73,120 +101,143 @@ class SyntheticLogGenerator:
             root_cause_summary=root_cause,
         )
 
+    def _emit_session(
+        self,
+        bug: Defects4JBug,
+        test_outputs: List[TestOutput],
+        failed_tests: List[TestOutput],
+        iso_cache: Dict[int, str],
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
+        """
+        Yield the (log entry, step) pairs of all 5 phases, in order.
+        The step is None for log entries that don't add a timeline step.
+        """
+        # Phase 1: Initial setup and test execution
+        yield from self._generate_setup_phase(bug, test_outputs, iso_cache)
+        # Phase 2: Test failures and error analysis
+        yield from self._generate_failure_phase(bug, failed_tests, iso_cache)
+        # Phase 3: Code investigation
+        yield from self._generate_investigation_phase(bug, iso_cache)
+        # Phase 4: Root cause identification
+        yield from self._generate_discovery_phase(bug, iso_cache)
+        # Phase 5: Fix application and verification
+        yield from self._generate_resolution_phase(bug, iso_cache)
+
     def _generate_setup_phase(
-        self, bug: Defects4JBug, test_outputs: List[TestOutput]
-    ) -> tuple:
+        self,
+        bug: Defects4JBug,
+        test_outputs: List[TestOutput],
+        iso_cache: Dict[int, str],
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
         """
         Generate logs for the setup phase.
         This simulates building the project and preparing to run tests.
         """
-        logs = []
-        steps = []
-        t = self.base_time  # Current timestamp
+        t = 0  # Seconds since base_time
 
         # Log: Building the project
-        logs.append(
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),  # Convert to string like "2024-01-15T10:30:00"
+                timestamp=self._timestamp(iso_cache, t),  # String like "2024-01-15T10:30:00"
                 level="INFO",
                 source="build",
                 message=f"Building {bug.project} project (bug {bug.bug_id})",
                 metadata={"project": bug.project, "bug_id": bug.bug_id},
-            )
+            ),
+            f"Started investigating {bug.project} bug #{bug.bug_id}",
         )
-        steps.append(f"Started investigating {bug.project} bug #{bug.bug_id}")
 
         # Advance time by 5 seconds for next log
-        t += timedelta(seconds=5)
+        t += 5
         
         # Log: Running tests
-        logs.append(
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="INFO",
                 source="test_runner",
                 message=f"Running test suite ({len(test_outputs)} tests)",
                 metadata={"test_count": len(test_outputs)},
-            )
+            ),
+            "Executed test suite to reproduce issue",
         )
-        steps.append("Executed test suite to reproduce issue")
-
-        return logs, steps
 
     def _generate_failure_phase(
-        self, bug: Defects4JBug, test_outputs: List[TestOutput]
-    ) -> tuple:
+        self,
+        bug: Defects4JBug,
+        failed_tests: List[TestOutput],
+        iso_cache: Dict[int, str],
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
         """
         Generate logs for test failures.
         This uses the REAL test output from Defects4J.
+        failed_tests: Only the tests that failed
         """
-        logs = []
-        steps = []
-        t = self.base_time + timedelta(seconds=10)  # Start 10 seconds after base time
+        t = 10  # Start 10 seconds after base time
 
         # Process each test that failed
-        for i, test_output in enumerate(test_outputs):
-            if test_output.status == "FAIL":
-                t += timedelta(seconds=2)
+        for test_output in failed_tests:
+            t += 2
+            step = f"Identified failing test: {test_output.test_name}"
+
+            # Log the test failure
+            failure_log = LogEntry(
+                timestamp=self._timestamp(iso_cache, t),
+                level="ERROR",
+                source="test",
+                message=f"Test failed: {test_output.test_name}",
+                metadata={
+                    "test_name": test_output.test_name,
+                    "error": test_output.error_message,
+                    "execution_time": test_output.execution_time,
+                },
+            )
 
-                # Log the test failure
-                logs.append(
+            # Log the stack trace if available
+            if test_output.stack_trace:
+                t += 1
+                # The step is attached to the stack trace log, so the
+                # failure log itself doesn't add one
+                yield failure_log, None
+                yield (
                     LogEntry(
-                        timestamp=t.isoformat(),
+                        timestamp=self._timestamp(iso_cache, t),
                         level="ERROR",
                         source="test",
-                        message=f"Test failed: {test_output.test_name}",
-                        metadata={
-                            "test_name": test_output.test_name,
-                            "error": test_output.error_message,
-                            "execution_time": test_output.execution_time,
-                        },
-                    )
+                        message=f"Stack trace for {test_output.test_name}",
+                        metadata={"stack_trace": test_output.stack_trace[:500]},  # First 500 chars
+                    ),
+                    step,
                 )
+            else:
+                yield failure_log, step
 
-                # Log the stack trace if available
-                if test_output.stack_trace:
-                    t += timedelta(seconds=1)
-                    logs.append(
-                        LogEntry(
-                            timestamp=t.isoformat(),
-                            level="ERROR",
-                            source="test",
-                            message=f"Stack trace for {test_output.test_name}",
-                            metadata={"stack_trace": test_output.stack_trace[:500]},  # First 500 chars
-                        )
-                    )
-
-                steps.append(f"Identified failing test: {test_output.test_name}")
-
-        return logs, steps
-
-    def _generate_investigation_phase(self, bug: Defects4JBug) -> tuple:
+    def _generate_investigation_phase(
+        self, bug: Defects4JBug, iso_cache: Dict[int, str]
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
         """
         Generate logs for code investigation.
         Simulates a developer examining the code to understand the problem.
         """
-        logs = []
-        steps = []
-        t = self.base_time + timedelta(minutes=1)  # 1 minute into debugging
+        t = 60  # 1 minute into debugging
 
-        logs.append(
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="DEBUG",
                 source="debugger",
                 message="Starting code investigation",
                 metadata={"modified_classes": bug.modified_classes},
-            )
+            ),
+            "Began examining modified classes",
         )
-        steps.append("Began examining modified classes")
 
         # Simulate investigating each modified class
-        for i, class_name in enumerate(bug.modified_classes[:3]):  # First 3 classes
-            t += timedelta(seconds=10)
-            logs.append(
+        for class_name in bug.modified_classes[:3]:  # First 3 classes
+            t += 10
+            yield (
                 LogEntry(
-                    timestamp=t.isoformat(),
+                    timestamp=self._timestamp(iso_cache, t),
                     level="DEBUG",
                     source="debugger",
                     message=f"Examining class: {class_name}",
@@ -194,94 +245,105 @@ class SyntheticLogGenerator:
                         "class": class_name,
                         "methods_checked": ["method1", "method2"],  # Simulated method names
                     },
-                )
+                ),
+                f"Analyzed {class_name}",
             )
-            steps.append(f"Analyzed {class_name}")
 
-        return logs, steps
-
-    def _generate_discovery_phase(self, bug: Defects4JBug) -> tuple:
+    def _generate_discovery_phase(
+        self, bug: Defects4JBug, iso_cache: Dict[int, str]
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
         """
         Generate logs for discovering the root cause.
         This is where the developer figures out what's wrong.
         """
-        logs = []
-        steps = []
-        t = self.base_time + timedelta(minutes=2)  # 2 minutes into debugging
+        t = 120  # 2 minutes into debugging
 
         # Try to guess what type of bug it is based on the patch
         root_cause_hint = self._infer_root_cause_from_patch(bug.patch)
 
-        logs.append(
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="INFO",
                 source="debugger",
                 message=f"Root cause identified: {root_cause_hint}",
                 metadata={"bug_url": bug.bug_report_url},
-            )
+            ),
+            f"Discovered root cause: {root_cause_hint}",
         )
-        steps.append(f"Discovered root cause: {root_cause_hint}")
 
-        t += timedelta(seconds=5)
-        logs.append(
+        t += 5
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="DEBUG",
                 source="debugger",
                 message="Analyzing patch differences",
                 metadata={"modified_files": len(bug.modified_classes)},
-            )
+            ),
+            "Reviewed patch to understand fix",
         )
-        steps.append("Reviewed patch to understand fix")
 
-        return logs, steps
-
-    def _generate_resolution_phase(self, bug: Defects4JBug) -> tuple:
+    def _generate_resolution_phase(
+        self, bug: Defects4JBug, iso_cache: Dict[int, str]
+    ) -> Iterator[Tuple[LogEntry, Optional[str]]]:
         """
         Generate logs for fixing the bug.
         Simulates applying the patch and verifying it works.
         """
-        logs = []
-        steps = []
-        t = self.base_time + timedelta(minutes=3)  # 3 minutes into debugging
+        t = 180  # 3 minutes into debugging
 
-        logs.append(
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="INFO",
                 source="vcs",  # Version control system
                 message="Applying patch to fix bug",
                 metadata={"bug_id": bug.bug_id},
-            )
+            ),
+            "Applied patch from fixed version",
         )
-        steps.append("Applied patch from fixed version")
 
-        t += timedelta(seconds=10)
-        logs.append(
+        t += 10
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="INFO",
                 source="test_runner",
                 message="Re-running tests after fix",
                 metadata={"expected_result": "PASS"},
-            )
+            ),
+            "Verified fix by re-running tests",
         )
-        steps.append("Verified fix by re-running tests")
 
-        t += timedelta(seconds=5)
-        logs.append(
+        t += 5
+        yield (
             LogEntry(
-                timestamp=t.isoformat(),
+                timestamp=self._timestamp(iso_cache, t),
                 level="INFO",
                 source="test",
                 message="All tests passing after fix",
                 metadata={"status": "SUCCESS"},
-            )
+            ),
+            "Confirmed all tests now pass",
         )
-        steps.append("Confirmed all tests now pass")
 
-        return logs, steps
+    def _timestamp(self, iso_cache: Dict[int, str], offset: int) -> str:
+        """
+        Get the timestamp string for 'offset' seconds after base_time.
+
+        Args:
+            iso_cache: Strings already formatted for this session, by offset
+            offset: Seconds since base_time
+
+        Returns:
+            ISO formatted timestamp like "2024-01-15T10:30:00"
+        """
+        iso = iso_cache.get(offset)
+        if iso is None:
+            iso = (self.base_time + timedelta(seconds=offset)).isoformat()
+            iso_cache[offset] = iso
+        return iso
 
     def _infer_root_cause_from_patch(self, patch: str) -> str:
         """
@@ -291,28 +353,16 @@ class SyntheticLogGenerator:
         if not patch:
             return "Logic error in implementation"
 
-        # Look for keywords in the patch to guess bug type
-        if "null" in patch.lower():
-            return "Null pointer handling issue"
-        elif "bound" in patch.lower() or "index" in patch.lower():
-            return "Array bounds or indexing error"
-        elif "assert" in patch.lower():
-            return "Assertion or validation error"
-        elif "==" in patch or "!=" in patch:
-            return "Comparison or equality check error"
-        else:
-            return "Logic error in implementation"
+        return _classify_patch(patch)
 
     def _generate_root_cause_summary(
-        self, bug: Defects4JBug, test_outputs: List[TestOutput]
+        self, bug: Defects4JBug, failed_tests: List[TestOutput]
     ) -> str:
         """
         Generate a human-readable summary of what caused the bug.
         This combines information from tests and bug details.
+        failed_tests: Only the tests that failed
         """
-        # Count how many tests failed
-        failed_tests = [t for t in test_outputs if t.status == "FAIL"]
-
         # Build summary string
         summary = f"Bug in {bug.project} (#{bug.bug_id}): "
         summary += f"{len(failed_tests)} test(s) failed. "
@@ -1,14 +1,45 @@
+import csv
 import json
+import logging
+import mmap
+import os
 import subprocess
 import re
-from typing import List, Dict, Any, Optional
+import time
+import shutil
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 
 from utils import Defects4JBug,TestOutput
 
+# Debug output goes through logging instead of print(), so it costs nothing
+# unless someone turns on DEBUG (see logging.basicConfig in main.py).
+# Use %-style arguments, not f-strings: the message is only built if it
+# will actually be shown.
+log = logging.getLogger(__name__)
+
+# PRE-COMPILED REGEX PATTERNS
+# These patterns never change, so we compile them once when the module is
+# imported instead of re-parsing them every time we process a bug.
+
+# Failing test lines in 'defects4j test' output: "  - org.Foo::testBar"
+# (a bytes pattern, because the output is read undecoded, see run_tests;
+# the pipe is binary, so a Windows line end "\r" may be left on the line)
+_FAILING_TEST_RE = re.compile(rb"^  - ([a-zA-Z0-9_.$:]+)\r?$", re.MULTILINE)
+# Header line of a test section in the failing_tests file: "--- org.Foo::testBar"
+# (a bytes pattern, because we search the raw file contents, see _index_failing_tests)
+_FAILING_HEADER_RE = re.compile(rb"(?m)^---\s(.*)$")
+
+# How many parsed failing_tests files to keep in memory (one per checkout).
+# Every bug has its own checkout, so without a limit a long run would keep
+# the errors of every bug it has ever tested.
+_FAILING_TESTS_CACHE_SIZE = 32
+
 
 class Defects4JManager:
     """
@@ -16,14 +47,104 @@ class Defects4JManager:
     This class runs defects4j commands and parses their output.
     """
 
-    def __init__(self, defects4j_home: str = None):
+    def __init__(
+        self,
+        defects4j_home: str = None,
+        cache_dir: Optional[Path] = Path(".d4j_cache"),
+        cache_max_age: timedelta = timedelta(days=1),
+    ):
         """
         Initialize the manager.
         defects4j_home: Path to Defects4J installation (optional)
+        cache_dir: Where results of slow defects4j commands are saved between
+            runs (bug info, patches, bug ID lists); None turns this off
+        cache_max_age: Saved results older than this are fetched again
         """
         self.defects4j_home = defects4j_home or "/path/to/defects4j"
-        # Get list of all available projects when we start
-        self.projects = self.get_all_projects()
+        self.cache_dir = cache_dir
+        self.cache_max_age = cache_max_age
+        # Bug ID lists we already fetched, keyed by project name
+        # (so we only run 'defects4j bids' once per project)
+        self._bids_cache: Dict[str, List[str]] = {}
+        # Bug info for whole projects fetched with 'defects4j query'
+        # (see prefetch_bug_info), keyed by (project, bug_id)
+        self._bug_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Detailed test failures (see _run_single_test) are appended to
+        # failing_tests.log. If this is set to a list, they are collected
+        # here instead, so parallel workers don't write to the same file.
+        self.failing_log: Optional[List[str]] = None
+        # Parsed failing_tests files: path -> ((mtime, size), {test name: error})
+        # Defects4J rewrites the file on every test run, so we also remember
+        # the file's mtime and size to notice when the cached copy is stale.
+        self._failing_tests_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+    @cached_property
+    def projects(self) -> List[str]:
+        """
+        List of all available projects.
+        Only fetched the first time it is used (and then remembered), so
+        code that already knows its project never runs 'defects4j pids'.
+        """
+        return self.get_all_projects()
+
+    def _cached_file(self, name: str) -> Optional[Path]:
+        """
+        Find a saved result in the disk cache.
+
+        Returns:
+            Path of the cache file, or None if it doesn't exist, is too old,
+            or the cache is turned off
+        """
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / name
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        return path if age < self.cache_max_age.total_seconds() else None
+
+    def _write_cache(self, name: str, text: str) -> None:
+        """
+        Save a result in the disk cache (does nothing if the cache is off).
+        """
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first and then rename it, so another
+        # process never reads a half-written cache file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _run(
+        self, args: List[str], check: bool = False, **kwargs
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a command given as a list of arguments.
+
+        No shell is started in between (one process instead of two), and
+        names like the project or bug ID can't be misread as shell syntax.
+        Output is captured as text unless the caller says otherwise.
+
+        Args:
+            args: Program and its arguments, e.g. ["defects4j", "pids"]
+            check: Raise CalledProcessError if the command fails
+            **kwargs: Passed on to subprocess.run (cwd, env, ...)
+        """
+        kwargs.setdefault("capture_output", True)
+        kwargs.setdefault("text", True)
+        try:
+            result = subprocess.run(args, **kwargs)
+        except FileNotFoundError as e:
+            # Program isn't installed: report it like the shell used to,
+            # as a failed command with exit code 127
+            result = subprocess.CompletedProcess(args, 127, "", str(e))
+
+        if check:
+            result.check_returncode()
+        return result
 
     def get_all_projects(self) -> List[str]:
         """
@@ -32,24 +153,18 @@ class Defects4JManager:
         """
         try:
             # Run the defects4j command to get project IDs
-            cmd = "defects4j pids"
-            result = subprocess.run(
-                cmd, 
-                shell=True,  # Run through shell
-                capture_output=True,  # Capture stdout and stderr
-                text=True,  # Return as string, not bytes
-                check=True  # Raise exception if command fails
-            )
+            # (check=True raises an exception if the command fails)
+            result = self._run(["defects4j", "pids"], check=True)
             # Parse output: each line is a project name
             projects = result.stdout.strip().split("\n")
             # Remove empty lines
             projects = [p.strip() for p in projects if p.strip()]
-            print(f"Found {len(projects)} Defects4J projects: {', '.join(projects)}")
+            log.info("Found %d Defects4J projects: %s", len(projects), ", ".join(projects))
             return projects
         except subprocess.CalledProcessError as e:
             # If command fails, use hardcoded list as fallback
-            print(f"Error getting projects: {e}")
-            print("Falling back to default project list")
+            log.warning("Error getting projects: %s", e)
+            log.warning("Falling back to default project list")
             return ["Chart", "Closure", "Lang", "Math", "Mockito", "Time"]
 
     def get_bug_info(self, project: str, bug_id: str) -> Defects4JBug:
@@ -63,18 +178,72 @@ class Defects4JManager:
         Returns:
             Defects4JBug object with all bug information
         """
-        # Run 'defects4j info' command to get bug details
-        cmd = f"defects4j info -p {project} -b {bug_id}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-        # Parse the text output into structured data
-        info = self._parse_bug_info(result.stdout)
+        # Reuse the result of an earlier run if we have one
+        cache_name = f"{project}_{bug_id}.json"
+        cached = self._cached_file(cache_name)
+        if cached:
+            return Defects4JBug(**json.loads(cached.read_text(encoding="utf-8")))
+
+        # Only save results we know are good, never a failed command
+        # (otherwise the empty bug would be reused until the cache expires)
+        cacheable = False
+        queried = self._bug_cache.get((project, bug_id))
+        if queried is not None:
+            # Already fetched for the whole project by prefetch_bug_info
+            info = {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in queried.items()
+            }
+            cacheable = True
+        else:
+            # Run 'defects4j info' command to get bug details
+            result = self._run(["defects4j", "info", "-p", project, "-b", bug_id])
+            cacheable = result.returncode == 0 and bool(result.stdout.strip())
+            if result.returncode != 0:
+                log.warning("Could not get info for %s-%s: %s", project, bug_id, result.stderr)
+
+            # Parse the text output into structured data
+            info = self._parse_bug_info(result.stdout)
         info["project"] = project
         info["bug_id"] = bug_id
+        if cacheable:
+            self._write_cache(cache_name, json.dumps(info))
 
         # Create and return bug object
         return Defects4JBug(**info)
 
+    def prefetch_bug_info(self, project: str) -> None:
+        """
+        Fetch the info for ALL bugs of a project with one 'defects4j query'.
+
+        'defects4j query' prints one CSV row per bug, for example:
+            1,"org.Foo;org.Bar","org.FooTest::testA;org.FooTest::testB",https://...
+        (bug ID first, then the requested fields; lists are separated by ";").
+        After this, get_bug_info for this project doesn't start any process.
+        The bug ID list is remembered too, for get_all_bugs.
+        """
+        fields = ["classes.modified", "tests.trigger", "report.url"]
+        result = self._run(["defects4j", "query", "-p", project, "-q", ",".join(fields)])
+        if result.returncode != 0:
+            log.warning("Could not query %s bugs: %s", project, result.stderr)
+            return
+
+        bug_ids = []
+        for row in csv.reader(result.stdout.splitlines()):
+            if len(row) != len(fields) + 1:
+                continue  # Not a data row
+            bug_id, classes, tests, url = (value.strip() for value in row)
+            bug_ids.append(bug_id)
+            self._bug_cache[(project, bug_id)] = {
+                "triggering_tests": [t for t in tests.split(";") if t],
+                "bug_report_url": url,
+                "patch": "",  # Will be filled later by export_patch method
+                "modified_classes": [c for c in classes.split(";") if c],
+            }
+
+        if bug_ids:
+            self._bids_cache.setdefault(project, bug_ids)
+
     def _parse_bug_info(self, info_output: str) -> Dict:
         """
         Parse the text output from 'defects4j info' command.
@@ -88,88 +257,189 @@ class Defects4JManager:
             List of modified sources:
         - org/apache/SomeClass.java
         """
-        info = {}
-
-        # REGEX EXPLANATION:
-        # r"..." means raw string (backslashes are literal)
-        # \s* means zero or more whitespace characters
-        # \n means newline
-        # (?:...) is non-capturing group
-        # ^ means start of line
-        # + means one or more
-        # re.MULTILINE makes ^ match start of each line
-
-        # Find triggering tests section
-        # This regex looks for "Root cause in triggering tests:" followed by
-        # indented lines (which contain the test names)
-        tests_match = re.search(
-            r"Root cause in triggering tests:\s*\n((?:^[ \t].*\n)+)",
-            info_output,
-            re.MULTILINE,
-        )
+        info = {"bug_report_url": ""}
+        tests = []  # Triggering test names
+        sources = []  # Modified source files
+        blocks = {"tests": [], "sources": []}  # Raw indented lines, for debugging
+        # Only keep the raw lines if they are going to be logged
+        debug = log.isEnabledFor(logging.DEBUG)
+
+        # We read the output ONCE, line by line, remembering which section
+        # we are in. Sections start with a header line; their items are the
+        # indented lines that follow it. Any other line ends the section.
+        section = None  # "tests", "sources", "url" or None
+        for line in info_output.splitlines():
+            if line.startswith("Root cause in triggering tests:"):
+                section = "tests"
+            elif line.startswith("List of modified sources:"):
+                section = "sources"
+            elif line.startswith("Bug report url:"):
+                # The URL is either on the same line or on the next one
+                url = line[len("Bug report url:"):].strip()
+                if url:
+                    info["bug_report_url"] = url
+                    section = None
+                else:
+                    section = "url"
+            elif section == "url":
+                if line.strip():
+                    info["bug_report_url"] = line.strip()
+                    section = None
+            elif section and line[:1] in (" ", "\t"):
+                if debug:
+                    blocks[section].append(line)
+                item = line.lstrip()
+                # Items look like "  - TestName"; skip anything else
+                if not item.startswith("-"):
+                    continue
+                name = item[1:].strip()
+                if section == "tests":
+                    # Test names need a space after the dash.
+                    # FIXED: Exclude lines that start with "-->" (exception details)
+                    if item[1:2].isspace() and not name.startswith("->"):
+                        tests.append(name)
+                elif name:
+                    sources.append(name)
+            else:
+                section = None
 
-        if tests_match:
+        if debug:
             # Debug output to see what we found
-            print("Triggering tests block:\n" + tests_match.group(1).rstrip())
-            # Extract lines that start with a dash (test names)
-            # This finds all lines like "  - TestName"
-            # FIXED: Exclude lines that start with "-->" (exception details)
-            tests = re.findall(r"^\s*-\s+(?!->)(.+)$", tests_match.group(1), re.MULTILINE)
-            print("Parsed triggering tests:", tests)
-            info["triggering_tests"] = tests
-        else:
-            print("No triggering tests found")
-            info["triggering_tests"] = []
-
-        # Find bug report URL (simpler regex)
-        url_match = re.search(r"Bug report url:\s*(.+)", info_output)
-        info["bug_report_url"] = url_match.group(1) if url_match else ""
-        
-        # Find modified source files
-        sources_match = re.search(
-            r"List of modified sources:\s*\n((?:^[ \t].*\n)+)",
-            info_output,
-            re.MULTILINE,
-        )
-        if sources_match:
-            sources_block = sources_match.group(1)
-            print("Modified sources block:\n" + sources_block.rstrip())
-            # Extract file names after dashes
-            sources = re.findall(r"^\s*-\s*(.+)$", sources_block, re.MULTILINE)
-            print("Parsed modified sources:", sources)
-            info["modified_classes"] = sources
-        else:
-            info["modified_classes"] = []
+            if blocks["tests"]:
+                log.debug("Triggering tests block:\n%s", "\n".join(blocks["tests"]))
+                log.debug("Parsed triggering tests: %s", tests)
+            else:
+                log.debug("No triggering tests found")
+            if blocks["sources"]:
+                log.debug("Modified sources block:\n%s", "\n".join(blocks["sources"]))
+                log.debug("Parsed modified sources: %s", sources)
+        info["triggering_tests"] = tests
+        info["modified_classes"] = sources
 
         info["patch"] = ""  # Will be filled later by export_patch method
 
         return info
 
     def checkout_bug(
-        self, project: str, bug_id: str, work_dir: Path, version: str = "b"
+        self,
+        project: str,
+        bug_id: str,
+        work_dir: Path,
+        version: str = "b",
+        force: bool = False,
     ) -> Path:
         """
         Download the source code for a specific bug version.
+        If it was already downloaded (e.g. by an earlier run), it is reused.
         
         Args:
             project: Project name
             bug_id: Bug identifier
             work_dir: Directory to store the code
             version: "b" for buggy version, "f" for fixed version
+            force: Delete any existing checkout and download it again
         
         Returns:
             Path where the code was downloaded
         """
         # Create directory name like "Lang_1_b" for buggy version of Lang bug #1
         checkout_path = work_dir / f"{project}_{bug_id}_{version}"
+
+        # Defects4J writes .defects4j.config into every checkout it makes,
+        # so if that file is there we already have this version
+        if (checkout_path / ".defects4j.config").exists():
+            if not force:
+                log.info("Reusing existing checkout %s", checkout_path)
+                return checkout_path
+            shutil.rmtree(checkout_path)
+
         checkout_path.mkdir(parents=True, exist_ok=True)
 
         # Run defects4j checkout command
-        cmd = f"defects4j checkout -p {project} -v {bug_id}{version} -w {checkout_path}"
-        subprocess.run(cmd, shell=True, check=True)
+        self._run(
+            ["defects4j", "checkout", "-p", project, "-v", f"{bug_id}{version}", "-w", str(checkout_path)],
+            check=True,
+            capture_output=False,  # Let checkout progress show in the terminal
+            env=self._java_env(checkout_path),
+        )
 
         return checkout_path
 
+    def _java_env(self, checkout_path: Path) -> Dict[str, str]:
+        """
+        Environment for defects4j commands that may start a JVM.
+
+        Gives every checkout its own java.io.tmpdir so that several bugs
+        can be checked out and tested at the same time without their JVMs
+        fighting over the same files in /tmp.
+        """
+        tmp_dir = checkout_path.parent / ".tmp" / checkout_path.name
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        env = dict(os.environ)
+        # Keep any options the user already set and add ours at the end
+        java_opts = env.get("JAVA_TOOL_OPTIONS", "")
+        env["JAVA_TOOL_OPTIONS"] = f"{java_opts} -Djava.io.tmpdir={tmp_dir.resolve()}".strip()
+        return env
+
+    def run_all_bugs_parallel(
+        self,
+        projects: List[str],
+        work_dir: Path,
+        max_workers: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], List[TestOutput]]:
+        """
+        Check out and test every bug of the given projects, several at a time.
+
+        Each bug runs in its own worker process with its own checkout
+        directory and java.io.tmpdir (see _java_env), so they don't get in
+        each other's way. Every bug is a full checkout plus test run, so
+        bugs are handed out one at a time to keep all workers busy.
+
+        Args:
+            projects: Project names, e.g. ["Lang", "Math"]
+            work_dir: Directory to store the checkouts
+            max_workers: Number of worker processes (default: CPU count)
+
+        Returns:
+            Dictionary mapping (project, bug_id) -> test results
+        """
+        bugs = []
+        for project in projects:
+            # One 'defects4j query' per project, so workers don't need 'defects4j info'
+            self.prefetch_bug_info(project)
+            bugs.extend((project, bug_id) for bug_id in self.get_all_bugs(project))
+
+        # One bug per task, so any workers beyond the number of bugs
+        # would never get work
+        workers = max(1, min(len(bugs), max_workers or os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                self._checkout_and_test,
+                [project for project, _ in bugs],
+                [bug_id for _, bug_id in bugs],
+                [work_dir] * len(bugs),
+            )
+            return dict(zip(bugs, results))
+
+    def _checkout_and_test(
+        self, project: str, bug_id: str, work_dir: Path
+    ) -> List[TestOutput]:
+        """
+        Worker for run_all_bugs_parallel: checkout one bug and run its
+        triggering tests. Returns an empty list if anything goes wrong.
+        """
+        # The error details end up in the returned TestOutputs; keep them out
+        # of failing_tests.log, which all the workers would be writing to
+        self.failing_log = []
+        try:
+            checkout_path = self.checkout_bug(project, bug_id, work_dir)
+            bug_info = self.get_bug_info(project, bug_id)
+            return self.run_tests(checkout_path, bug_info.triggering_tests)
+        except Exception as e:
+            log.warning("Could not test %s-%s: %s", project, bug_id, e)
+            return []
+
     def run_tests(
         self, checkout_path: Path, specific_tests: List[str] = None
     ) -> List[TestOutput]:
@@ -192,10 +462,25 @@ class Defects4JManager:
                 if output:
                     outputs.append(output)
         else:
-            # Run all tests using defects4j test command
-            cmd = f"cd {checkout_path} && defects4j test"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            outputs = self._parse_test_output(result.stdout, result.stderr)
+            # Run all tests using defects4j test command.
+            # The output can be many MB, so instead of collecting all of it we
+            # read it line by line while the tests are still running.
+            # The lines are read as raw bytes: only the few failing test
+            # names are ever decoded, not the whole output.
+            try:
+                proc = subprocess.Popen(
+                    ["defects4j", "test"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,  # Not used, don't buffer it
+                    cwd=checkout_path,
+                    env=self._java_env(checkout_path),
+                )
+            except FileNotFoundError as e:
+                log.warning("Could not run defects4j test: %s", e)
+                return outputs
+
+            with proc:
+                outputs = self._parse_test_output(proc.stdout)
 
             # Defects4J creates a "failing_tests" file with detailed error info
             # failing_tests_file = checkout_path / "failing_tests"
@@ -219,52 +504,70 @@ class Defects4JManager:
             TestOutput object with results, or None if test couldn't run
         """
         # Run specific test using -t flag
-        cmd = f"cd {checkout_path} && defects4j test -t {test_name}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = self._run(
+            ["defects4j", "test", "-t", test_name],
+            cwd=checkout_path,
+            env=self._java_env(checkout_path),
+        )
 
         # Parse the result
         output = self._parse_single_test_result(test_name, result.stdout, result.stderr)
 
         # Try to get more detailed failure info from Defects4J output files
+        # (if the file doesn't exist the index is just empty)
         failing_tests_file = checkout_path / "failing_tests"
-        if failing_tests_file.exists():
-            with open(failing_tests_file, "r") as f:
-                failing_content = f.read()
-                # If this test failed, extract the error message
-                if test_name in failing_content:
-                    if not output.error_message:
-                        output.error_message = self._extract_error_from_failing_tests(
-                            failing_content, test_name
-                        )
-                    print(f"Detailed error for {test_name}:")
-                    print(output.error_message)
-                    
-                    # checkout path
-                    # test name
-                    # error message
+        failing_index = self._index_failing_tests(failing_tests_file)
+        if failing_index:
+            # If this test failed, extract the error message
+            error_message = self._extract_error_from_failing_tests(failing_index, test_name)
+            if error_message is not None:
+                if not output.error_message:
+                    output.error_message = error_message
+                log.debug("Detailed error for %s:\n%s", test_name, output.error_message)
+
+                # checkout path
+                # test name
+                # error message
+                entry = (
+                    f"Checkout Path: {checkout_path}\n"
+                    f"Test Name: {test_name}\n"
+                    f"Error Message: {output.error_message}\n"
+                )
+                if self.failing_log is not None:
+                    self.failing_log.append(entry)
+                else:
                     with open("failing_tests.log", "a", encoding="utf-8") as nf:
-                        nf.write(f"Checkout Path: {checkout_path}\n")
-                        nf.write(f"Test Name: {test_name}\n")
-                        nf.write(f"Error Message: {output.error_message}\n")
-                        
+                        nf.write(entry)
+
         return output
 
-    def _parse_test_output(self, stdout: str, stderr: str) -> List[TestOutput]:
+    def _parse_test_output(self, lines: Iterable[bytes]) -> List[TestOutput]:
         """
         Parse the output from running multiple tests.
         Defects4J output format shows failing tests with "  - " prefix.
+
+        Args:
+            lines: Undecoded output lines, e.g. a binary subprocess pipe
+                (read as it arrives)
         """
         outputs = []
+        # Checked once, not for every line of output
+        debug = log.isEnabledFor(logging.DEBUG)
+
+        for line in lines:
+            # Debug: show what we're parsing
+            if debug:
+                log.debug("Defects4J test output: %s", line.rstrip().decode("utf-8", "replace"))
+
+            # Find lines that start with "  - " (these are test names)
+            # The regex looks for lines starting with two spaces, dash, space, then test name
+            failing_match = _FAILING_TEST_RE.match(line)
+            if not failing_match:
+                continue
 
-        # Debug: show what we're parsing
-        print("Defects4J test output:\n" + stdout)
-        
-        # Find all lines that start with "  - " (these are test names)
-        # The regex looks for lines starting with two spaces, dash, space, then test name
-        failing_match = re.findall(r"^  - ([a-zA-Z0-9_.$:]+)$", stdout, re.MULTILINE)
-
-        # Create TestOutput object for each failing test
-        for test_name in failing_match:
+            # Create TestOutput object for each failing test
+            # (the pattern only matches ASCII characters, so this can't fail)
+            test_name = failing_match.group(1).decode("ascii")
             output = TestOutput(
                 test_name=test_name,
                 status="FAIL",
@@ -304,14 +607,16 @@ class Defects4JManager:
         This file contains the actual Java exceptions and stack traces.
         """
         try:
-            # Read the file with detailed failure information
-            with open(failing_tests_file, "r") as f:
-                failing_content = f.read()
+            # Read the file with detailed failure information (only once)
+            failing_index = self._index_failing_tests(failing_tests_file)
 
-            # Debug: show what's in the file
-            print(f"\n--- Content of failing_tests file ---")
-            print(failing_content[:1000])  # Show first 1000 characters
-            print("--- End of failing_tests preview ---\n")
+            # Debug: show which tests are in the file
+            # (joining the names is skipped entirely unless DEBUG is on)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "\n--- Tests in failing_tests file ---\n%s\n--- End of failing_tests preview ---\n",
+                    "\n".join(failing_index),
+                )
 
             # For each failing test, extract its error details
             for output in outputs:
@@ -319,21 +624,60 @@ class Defects4JManager:
                     # Extract detailed error and stack trace
                     if not output.error_message:
                         output.error_message = self._extract_error_from_failing_tests(
-                            failing_content, output.test_name
+                            failing_index, output.test_name
                         )
         except Exception as e:
             # If something goes wrong, log it but continue
-            print(f"Warning: Could not enrich failure details: {e}")
-            import traceback
-            traceback.print_exc()
+            # The full traceback is only worth formatting when debugging
+            log.warning(
+                "Could not enrich failure details: %s", e,
+                exc_info=log.isEnabledFor(logging.DEBUG),
+            )
 
         return outputs
 
-    def _extract_error_from_failing_tests(
-        self, content: str, test_name: str
-    ) -> Optional[str]:
+    def _index_failing_tests(self, failing_tests_file: Path) -> Dict[str, str]:
+        """
+        Read a failing_tests file once and index it by test name.
+        The result is cached, so looking up many tests only reads the file once.
+
+        Returns:
+            Dictionary mapping test name (as written in the file) -> error section
+            (empty if the file doesn't exist)
+        """
+        # Asking for the file's stats also tells us whether it exists,
+        # so no separate exists() check is needed
+        try:
+            stat = failing_tests_file.stat()
+        except FileNotFoundError:
+            return {}
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._failing_tests_cache.get(failing_tests_file)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        # mmap lets us search the file without first copying it into a
+        # Python string; only the error sections we keep get decoded.
+        # (an empty file can't be mapped, but then there's nothing to index)
+        index = {}
+        if stat.st_size:
+            with open(failing_tests_file, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    index = self._parse_failing_tests(content)
+
+        # Forget the oldest file when the cache is full
+        # (dicts remember insertion order, so that is the first key)
+        self._failing_tests_cache.pop(failing_tests_file, None)
+        if len(self._failing_tests_cache) >= _FAILING_TESTS_CACHE_SIZE:
+            del self._failing_tests_cache[next(iter(self._failing_tests_cache))]
+        self._failing_tests_cache[failing_tests_file] = (signature, index)
+        return index
+
+    def _parse_failing_tests(self, content: bytes) -> Dict[str, str]:
         """
-        Extract the complete error message (exception + stack trace) for a specific test.
+        Split the content of a failing_tests file into one entry per test.
+        content is the raw file (bytes or an mmap); the results are text.
 
         The failing_tests file format looks like:
         --- test.class.name::testMethod
@@ -344,44 +688,60 @@ class Defects4JManager:
         --- next.test::method
         ...
         """
-        # Defects4J sometimes uses different formats for test names
-        # Try multiple variations to find the test
-        test_name_variants = [
-            test_name,  # Original: org.Foo::testBar
-            test_name.replace("::", "."),  # Alternative: org.Foo.testBar
-            test_name.split("::")[0] if "::" in test_name else test_name,  # Just class: org.Foo
-        ]
+        index = {}
 
-        for variant in test_name_variants:
-            # Look for header line starting with "---" followed by test name
-            # re.escape() escapes special regex characters in the test name
-            header_re = rf"(?m)^---\s*{re.escape(variant)}(?:\s+(.*))?$"
-            header_match = re.search(header_re, content)
+        # Find all header lines in one pass. Each test's section runs from
+        # the end of its header line to the start of the next header.
+        headers = list(_FAILING_HEADER_RE.finditer(content))
+        for i, header_match in enumerate(headers):
+            end_pos = headers[i + 1].start() if i + 1 < len(headers) else len(content)
 
-            if not header_match:
-                continue  # Try next variant
+            header_parts = header_match.group(1).decode("utf-8", "replace").split(None, 1)
+            if not header_parts:
+                continue  # A bare "---" line, no test name
 
-            # Sometimes there's extra text on the header line
-            header_extra = header_match.group(1) or ""
+            test_name = header_parts[0]
+            if test_name in index:
+                continue  # If a test appears twice, the first entry wins
 
-            # Find where this test's section starts (right after header)
-            start_pos = header_match.end()
-
-            # Find where next test section starts (next "---" line)
-            next_header = re.search(r"(?m)^---\s", content[start_pos:])
-            # If found, that's where this section ends; otherwise, go to end of file
-            end_pos = start_pos + next_header.start() if next_header else len(content)
+            # Sometimes there's extra text on the header line
+            header_extra = header_parts[1].rstrip() if len(header_parts) > 1 else ""
 
             # Extract the error section between headers
-            rest_block = content[start_pos:end_pos].lstrip("\r\n").rstrip()
+            rest_block = content[header_match.end():end_pos].decode("utf-8", "replace")
+            rest_block = rest_block.lstrip("\r\n").rstrip()
 
             # Combine header extra (if any) with the rest
             if header_extra:
-                error_section = header_extra.rstrip() + "\n" + rest_block
+                error_section = header_extra + "\n" + rest_block
             else:
                 error_section = rest_block
 
-            if error_section.strip():
+            index[test_name] = error_section
+
+        return index
+
+    def _extract_error_from_failing_tests(
+        self, failing_index: Dict[str, str], test_name: str
+    ) -> Optional[str]:
+        """
+        Get the complete error message (exception + stack trace) for a specific test.
+
+        Args:
+            failing_index: Indexed failing_tests file (see _index_failing_tests)
+            test_name: Name of the test, e.g. "org.Foo::testBar"
+        """
+        # Defects4J sometimes uses different formats for test names
+        # Try multiple variations to find the test
+        test_name_variants = [
+            test_name,  # Original: org.Foo::testBar
+            test_name.replace("::", "."),  # Alternative: org.Foo.testBar
+            test_name.split("::")[0] if "::" in test_name else test_name,  # Just class: org.Foo
+        ]
+
+        for variant in test_name_variants:
+            error_section = failing_index.get(variant)
+            if error_section and error_section.strip():
                 return error_section
 
         # If we couldn't find the test with any variant
@@ -405,7 +765,12 @@ class Defects4JManager:
     #     # Return whichever command succeeded
     #     return result_diff.stdout if result_diff.returncode == 0 else result.stdout
     
-    def export_patch(self, project: str, bug_id: str, work_dir: Path) -> str:
+    def export_patch(
+        self,
+        project: str,
+        bug_id: str,
+        work_dir: Path,
+    ) -> str:
         """
         Export the patch (code changes) that fixed the bug.
         This compares buggy version (b) with fixed version (f).
@@ -415,32 +780,48 @@ class Defects4JManager:
             bug_id: Bug ID
             work_dir: Working directory for checkouts
         """
+        # Reuse the patch from an earlier run if we have one
+        # (this also skips checking out the fixed version)
+        cache_name = f"patches/{project}_{bug_id}.diff"
+        cached = self._cached_file(cache_name)
+        if cached:
+            return cached.read_text(encoding="utf-8")
+
+        patch = self._build_patch(project, bug_id, work_dir)
+        if patch:  # Don't remember failures
+            self._write_cache(cache_name, patch)
+        return patch
+
+    def _build_patch(self, project: str, bug_id: str, work_dir: Path) -> str:
+        """
+        Build the patch by diffing the buggy and fixed checkouts.
+        Same arguments as export_patch.
+        """
         buggy_path = work_dir / f"{project}_{bug_id}_b"
         fixed_path = work_dir / f"{project}_{bug_id}_f"
     
         # Method 1: Check out fixed version and manually diff
-        if not fixed_path.exists():
-            print(f"Checking out fixed version {project}-{bug_id}f...")
-            try:
-                self.checkout_bug(project, bug_id, work_dir, version='f')
-            except Exception as e:
-                print(f"Could not check out fixed version: {e}")
-                return ""
+        # (checkout_bug does nothing if it's already checked out)
+        try:
+            self.checkout_bug(project, bug_id, work_dir, version='f')
+        except Exception as e:
+            log.warning("Could not check out fixed version: %s", e)
+            return ""
         
+        # The two exports don't depend on each other, so they run at the same time.
+        exported = self._export_properties(buggy_path, ["classes.modified", "dir.src.classes"])
+
         # Get list of modified classes
-        cmd_modified = f"cd {buggy_path} && defects4j export -p classes.modified"
-        result_modified = subprocess.run(cmd_modified, shell=True, capture_output=True, text=True)
-        
+        result_modified = exported["classes.modified"]
         if result_modified.returncode != 0:
-            print(f"Warning: Could not get modified classes: {result_modified.stderr}")
+            log.warning("Could not get modified classes: %s", result_modified.stderr)
             return ""
-        
+
         modified_classes = result_modified.stdout.strip().split('\n')
-        print(f"Modified classes: {modified_classes}")
+        log.debug("Modified classes: %s", modified_classes)
         
         # Get source directories
-        cmd_src = f"cd {buggy_path} && defects4j export -p dir.src.classes"
-        result_src = subprocess.run(cmd_src, shell=True, capture_output=True, text=True)
+        result_src = exported["dir.src.classes"]
         src_dir = result_src.stdout.strip() if result_src.returncode == 0 else "src/main/java"
         
         # Build the diff manually by comparing files
@@ -455,12 +836,11 @@ class Defects4JManager:
             buggy_file = buggy_path / src_dir / file_path
             fixed_file = fixed_path / src_dir / file_path
             
-            print(f"Diffing {buggy_file} and {fixed_file}...")
+            log.debug("Diffing %s and %s...", buggy_file, fixed_file)
             
             if buggy_file.exists() and fixed_file.exists():
                 # Use diff command to get the changes
-                cmd_diff = f"diff -u {buggy_file} {fixed_file}"
-                result_diff = subprocess.run(cmd_diff, shell=True, capture_output=True, text=True)
+                result_diff = self._run(["diff", "-u", str(buggy_file), str(fixed_file)])
                 # diff returns non-zero when files differ, but that's expected
                 if result_diff.stdout.strip():
                     patch_parts.append(result_diff.stdout)
@@ -471,13 +851,60 @@ class Defects4JManager:
         # Method 2: Fallback - just list what was modified
         return f"Modified classes:\n" + '\n'.join(f"  - {cls}" for cls in modified_classes)
 
+    def _export_properties(
+        self, checkout_path: Path, properties: List[str]
+    ) -> Dict[str, subprocess.CompletedProcess]:
+        """
+        Run 'defects4j export -p <property>' for several properties at once.
+        All commands are started first and only then do we wait for them,
+        so the total time is that of the slowest one, not the sum.
+
+        Returns:
+            Dictionary mapping property -> finished command (stdout, returncode, ...)
+        """
+        results = {}
+        running = {}
+        for prop in properties:
+            args = ["defects4j", "export", "-p", prop]
+            try:
+                running[prop] = subprocess.Popen(
+                    args,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    cwd=checkout_path,
+                )
+            except FileNotFoundError as e:
+                # Same as _run: a missing program is a failed command
+                results[prop] = subprocess.CompletedProcess(args, 127, "", str(e))
+
+        for prop, proc in running.items():
+            stdout, stderr = proc.communicate()
+            results[prop] = subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+
+        return results
+
     def get_all_bugs(self, project: str) -> List[str]:
         """
         Get list of all bug IDs for a project.
         Each project has multiple bugs numbered 1, 2, 3, etc.
+        Results are cached, so asking twice for the same project is free.
         """
-        cmd = f"defects4j bids -p {project}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        if project in self._bids_cache:
+            return self._bids_cache[project]
+
+        # Reuse the list from an earlier run if we have one
+        cache_name = f"bids/{project}.json"
+        cached = self._cached_file(cache_name)
+        if cached:
+            bug_ids = json.loads(cached.read_text(encoding="utf-8"))
+        else:
+            result = self._run(["defects4j", "bids", "-p", project])
+
+            # Each line is a bug ID
+            bug_ids = result.stdout.strip().split("\n")
+            if result.returncode == 0 and result.stdout.strip():
+                self._write_cache(cache_name, json.dumps(bug_ids))
 
-        # Each line is a bug ID
-        return result.stdout.strip().split("\n")
+        self._bids_cache[project] = bug_ids
+        return bug_ids
@@ -16,6 +16,8 @@ Defects4J is a database of real bugs from Java projects. Each bug has:
 """
 
 import json
+import logging
+import os
 import subprocess
 import re
 from typing import List, Dict, Any, Optional
@@ -23,12 +25,68 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 
 #from dataset_exporter import DatasetExporter
 from defects_manager import Defects4JManager
 #from synthetic_log_generator import SyntheticLogGenerator
 
 
+def process_bug(
+    d4j: Defects4JManager, project: str, bug_id: str, work_dir: Path
+) -> str:
+    """
+    Process a single bug: checkout, run tests, export the patch.
+    This runs inside a worker process, so several bugs run at once.
+
+    Returns:
+        The text to append to failing_tests.log for this bug (detailed test
+        errors, then the bug report url and patch if everything worked)
+    """
+    print(f"\nProcessing {project} bug {bug_id}...")
+
+    # Collect this bug's log lines in memory; the main process writes them.
+    # Each worker gets its own copy of d4j, so changing it here is safe.
+    log_parts: List[str] = []
+    d4j.failing_log = log_parts
+
+    try:
+        # Step 1: Download the buggy version of the code
+        checkout_path = d4j.checkout_bug(project, bug_id, work_dir)
+
+        # Step 2: Get bug information
+        # (already fetched for the whole project by prefetch_bug_info)
+        bug_info = d4j.get_bug_info(project, bug_id)
+        bug_info.checkout_path = checkout_path
+
+        # Step 3: Run the failing tests to get real error messages
+        test_outputs = d4j.run_tests(checkout_path, bug_info.triggering_tests)
+        print(f"  Retrieved {len(test_outputs)} test outputs")
+
+        # Step 4: Get the patch that fixed the bug
+        bug_info.patch = d4j.export_patch(project, bug_id, work_dir)
+
+        # Step 5: Generate synthetic debug session
+        # session = generator.generate_debug_session(bug_info, test_outputs)
+
+        # Print summary
+        # print(f"  Generated {len(session.log_sequence)} log entries")
+        # print(f"  Root cause: {session.root_cause_summary}")
+
+        log_parts.append(f"report for {project}-{bug_id}:\n{bug_info.bug_report_url}\n")
+        log_parts.append(f"patch for {project}-{bug_id}:\n{bug_info.patch}\n")
+        log_parts.append("\n\n")  # two blank lines between entries
+
+    except Exception as e:
+        # If something goes wrong, log it and continue with next bug
+        print(f"  Error processing {project}-{bug_id}: {e}")
+        import traceback
+        traceback.print_exc()
+
+    return "".join(log_parts)
+
+
 def main():
     """
     Main pipeline execution.
@@ -40,6 +98,10 @@ def main():
     """
 
     # === CONFIGURATION ===
+    # Only show warnings and errors from the pipeline modules.
+    # Change to logging.DEBUG to see everything the parsers find.
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
     # Directory to store temporary files
     work_dir = Path("./defects4j_work")
     work_dir.mkdir(exist_ok=True)  # Create if doesn't exist
@@ -57,9 +119,15 @@ def main():
     print("=" * 80)
     print("Available Defects4J Projects:")
     print("=" * 80)
-    for i, project in enumerate(d4j.projects, 1):
+    # Fetch the bug lists for all projects at the same time.
+    # Each call just waits on a 'defects4j bids' subprocess, so threads let
+    # those waits overlap. The results are cached inside the manager, so the
+    # processing loop below doesn't run 'defects4j bids' again.
+    with ThreadPoolExecutor(max_workers=max(1, len(d4j.projects))) as pool:
+        bug_lists = list(pool.map(d4j.get_all_bugs, d4j.projects))
+    for i, (project, bug_list) in enumerate(zip(d4j.projects, bug_lists), 1):
         # Get number of bugs in each project
-        bug_count = len(d4j.get_all_bugs(project))
+        bug_count = len(bug_list)
         print(f"{i:2}. {project:20} ({bug_count} bugs)")
     print("=" * 80)
 
@@ -74,44 +142,29 @@ def main():
     # Get list of all bug IDs for this project
     bug_ids = d4j.get_all_bugs(project)  # Take first 5 bugs only
 
-    # Process each bug
-    for bug_id in bug_ids:
-        print(f"\nProcessing {project} bug {bug_id}...")
-
-        try:
-            # Step 1: Get bug information from Defects4J
-            bug_info = d4j.get_bug_info(project, bug_id)
-
-            # Step 2: Download the buggy version of the code
-            checkout_path = d4j.checkout_bug(project, bug_id, work_dir)
-            bug_info.checkout_path = checkout_path
-
-            # Step 3: Run the failing tests to get real error messages
-            test_outputs = d4j.run_tests(checkout_path, bug_info.triggering_tests)
-            print(f"  Retrieved {len(test_outputs)} test outputs")
-
-            # Step 4: Get the patch that fixed the bug
-            bug_info.patch = d4j.export_patch(project, bug_id, work_dir)
-            
-            with open("failing_tests.log", "a", encoding="utf-8") as nf:
-                nf.write(f"report for {project}-{bug_id}:\n{bug_info.bug_report_url}\n")
-                nf.write(f"patch for {project}-{bug_id}:\n{bug_info.patch}\n")
-                nf.write("\n\n")  # two blank lines between entries
-
-            # Step 5: Generate synthetic debug session
-            # session = generator.generate_debug_session(bug_info, test_outputs)
-            # sessions.append(session)
-
-            # Print summary
-            # print(f"  Generated {len(session.log_sequence)} log entries")
-            # print(f"  Root cause: {session.root_cause_summary}")
-
-        except Exception as e:
-            # If something goes wrong, log it and continue with next bug
-            print(f"  Error processing {project}-{bug_id}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+    # Fetch the info for all of this project's bugs with a single
+    # 'defects4j query' before starting the workers; each worker gets a
+    # copy of d4j with this info already in it.
+    d4j.prefetch_bug_info(project)
+
+    # Process the bugs in parallel. Every bug has its own checkout
+    # directories, so the workers never touch each other's files.
+    # executor.map returns results in the same order as bug_ids.
+    # Each bug is a full checkout plus test run, so bugs are handed out one
+    # at a time (the default chunksize) to keep every worker busy.
+    # With one bug per task there are len(bug_ids) tasks, so any workers
+    # beyond that would never get work.
+    workers = max(1, min(len(bug_ids), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            process_bug, repeat(d4j), repeat(project), bug_ids, repeat(work_dir),
+        )
+
+        # Only the main process writes to failing_tests.log. The file is
+        # opened once with a 64 KB buffer instead of once per bug.
+        with open("failing_tests.log", "a", encoding="utf-8", buffering=1 << 16) as nf:
+            for log_text in results:
+                nf.write(log_text)
 
     # === EXPORT RESULTS ===
     # print(f"\nExporting {len(sessions)} debug sessions...")
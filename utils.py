@@ -1,17 +1,16 @@
-import json
-import subprocess
-import re
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-import xml.etree.ElementTree as ET
 
 
 # DATACLASSES: These are like templates that define what information we store
 # @dataclass automatically creates __init__, __repr__, and other methods
+# slots=True stores the fields in fixed slots instead of a per-object __dict__,
+# which makes every object smaller and attribute access faster (we create
+# thousands of these). It also means you can't add new attributes later.
 
-@dataclass
+@dataclass(slots=True)
 class Defects4JBug:
     """
     Represents a bug from Defects4J database.
@@ -25,8 +24,23 @@ class Defects4JBug:
     modified_classes: List[str]  # Which Java classes were changed to fix the bug
     checkout_path: Optional[Path] = None  # Where the code is stored on disk
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a dictionary (for JSON export).
+        Much cheaper than dataclasses.asdict(), which deep-copies everything.
+        """
+        return {
+            "project": self.project,
+            "bug_id": self.bug_id,
+            "triggering_tests": self.triggering_tests,
+            "bug_report_url": self.bug_report_url,
+            "patch": self.patch,
+            "modified_classes": self.modified_classes,
+            "checkout_path": self.checkout_path,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class TestOutput:
     """
     Represents the result of running a single test.
@@ -39,8 +53,21 @@ class TestOutput:
     execution_time: float  # How long the test took to run (in seconds)
     timestamp: datetime  # When the test was run
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a dictionary (for JSON export).
+        """
+        return {
+            "test_name": self.test_name,
+            "status": self.status,
+            "error_message": self.error_message,
+            "stack_trace": self.stack_trace,
+            "execution_time": self.execution_time,
+            "timestamp": self.timestamp,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class LogEntry:
     """
     Represents a single log entry (like a line in a log file).
@@ -52,8 +79,20 @@ class LogEntry:
     message: str  # The actual log message
     metadata: Dict[str, Any] = None  # Additional structured data
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a dictionary (for JSON export).
+        """
+        return {
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "source": self.source,
+            "message": self.message,
+            "metadata": self.metadata,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class SyntheticDebugSession:
     """
     Complete debugging session with all information combined.
@@ -64,3 +103,24 @@ class SyntheticDebugSession:
     log_sequence: List[LogEntry]  # Synthetic logs we generated
     investigation_timeline: List[str]  # Human-readable steps of investigation
     root_cause_summary: str  # Brief explanation of what caused the bug
+    # Short name like "Lang_1", filled in automatically (see __post_init__)
+    bug_key: str = field(init=False)
+
+    def __post_init__(self):
+        # Build the key once here, instead of every time a session is exported
+        self.bug_key = f"{self.bug_info.project}_{self.bug_info.bug_id}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a dictionary (for JSON export).
+        The nested objects are left as they are; the JSON encoder calls
+        their own to_dict() when it gets to them.
+        """
+        return {
+            "bug_info": self.bug_info,
+            "test_outputs": self.test_outputs,
+            "log_sequence": self.log_sequence,
+            "investigation_timeline": self.investigation_timeline,
+            "root_cause_summary": self.root_cause_summary,
+            "bug_key": self.bug_key,
+        }